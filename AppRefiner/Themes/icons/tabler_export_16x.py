@@ -3,17 +3,24 @@
 # and build a sprite sheet PNG with a JSON map.
 
 import argparse
+import functools
 import os
+import re
 from pathlib import Path
-from xml.etree import ElementTree as ET
 
 os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
 
 from PySide6.QtCore import QRectF
-from PySide6.QtGui import QImage, QPainter
+from PySide6.QtGui import QColor, QImage, QPainter
 from PySide6.QtSvg import QSvgRenderer
-from PIL import Image
+from PIL import Image, ImageDraw, ImageFont
 import json
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional; fall back to the stdlib encoder
+    orjson = None
 
 # Per-kind slug and color
 THEMES = {
@@ -140,31 +147,53 @@ THEMES = {
 }
 }
 
-def recolor_svg(svg_bytes: bytes, hex_color: str, target_px: int) -> bytes:
-    root = ET.fromstring(svg_bytes)
-    root.set("width", str(target_px))
-    root.set("height", str(target_px))
-    root.set("color", hex_color)
-
-    def walk(elem):
-        st = elem.get("stroke")
-        if st is not None and st.strip().lower() == "currentcolor":
-            elem.set("stroke", hex_color)
-        fl = elem.get("fill")
-        if fl is not None and fl.strip().lower() == "currentcolor":
-            elem.set("fill", hex_color)
-        for child in list(elem):
-            walk(child)
-
-    walk(root)
-    return ET.tostring(root, encoding="utf-8")
+DEFAULT_COLOR = "#231f20"
+
+def color_to_rgb(color: str) -> tuple:
+    """Parse a color string (e.g. "#00b2e3") into an (r, g, b) tuple."""
+    qc = QColor(color)
+    return qc.red(), qc.green(), qc.blue()
+
+# (theme, kind) -> (slug, (r, g, b) or None), flattened once so the render loop
+# does a single lookup and tint_mask gets pre-parsed colors
+_FLAT = {
+    (theme, kind): (spec["slug"], color_to_rgb(spec["color"]) if "color" in spec else None)
+    for theme, kinds in THEMES.items()
+    for kind, spec in kinds.items()
+}
+
+# Tabler SVGs only use currentColor on stroke/fill, plus color on the root <svg> tag.
+# Size is left alone: QSvgRenderer.render() scales to the target rect.
+_CC = re.compile(rb'\b(stroke|fill)\s*=\s*"\s*currentColor\s*"', re.IGNORECASE)
+_SVG_OPEN = re.compile(rb'<svg\b([^>]*?)(/?)>')
+_ROOT_COLOR = re.compile(rb'\s+color\s*=\s*"[^"]*"')
+
+def recolor_svg(svg_bytes: bytes, color_b: bytes) -> bytes:
+    out = _CC.sub(rb'\1="' + color_b + rb'"', svg_bytes)
+
+    def rewrite_open(m):
+        attrs = _ROOT_COLOR.sub(b"", m.group(1))
+        return b'<svg' + attrs + b' color="' + color_b + b'"' + m.group(2) + b'>'
+
+    return _SVG_OPEN.sub(rewrite_open, out, count=1)
 
 def svg_path_for_slug(icons_dir: Path, slug: str) -> Path:
     return icons_dir / f"{slug}.svg"
 
-def render_svg_to_qimage(svg_bytes: bytes, size_px: int) -> QImage:
+# Scratch QImages keyed by format, reused across renders of the same size
+_scratch_images = {}
+
+def render_svg_to_qimage(svg_bytes: bytes, size_px: int, fmt=QImage.Format_RGBA8888) -> QImage:
+    """
+    Rasterize into the scratch QImage for the given format.
+    The returned image is overwritten by the next call, so callers must
+    copy out what they need before rendering again.
+    """
     renderer = QSvgRenderer(svg_bytes)
-    img = QImage(size_px, size_px, QImage.Format_RGBA8888)
+    img = _scratch_images.get(fmt)
+    if img is None or img.width() != size_px or img.height() != size_px:
+        img = QImage(size_px, size_px, fmt)
+        _scratch_images[fmt] = img
     img.fill(0)
     painter = QPainter(img)
     try:
@@ -175,48 +204,97 @@ def render_svg_to_qimage(svg_bytes: bytes, size_px: int) -> QImage:
         painter.end()
     return img
 
-def qimage_to_pillow(img: QImage) -> Image.Image:
-    if img.format() != QImage.Format_RGBA8888:
-        img = img.convertToFormat(QImage.Format_RGBA8888)
-    width, height = img.width(), img.height()
+@functools.lru_cache(maxsize=256)
+def load_svg(icons_dir: Path, style: str, slug: str) -> bytes:
+    """Read a Tabler SVG once per (style, slug), falling back to the outline set."""
+    svg_path = svg_path_for_slug(icons_dir / style, slug)
+    if not svg_path.exists():
+        svg_path = svg_path_for_slug(icons_dir / "outline", slug)
+    return svg_path.read_bytes()
+
+@functools.lru_cache(maxsize=None)
+def render_mask(icons_dir: Path, style: str, slug: str, size_px: int) -> np.ndarray:
+    """
+    Rasterize an icon once as an 8-bit coverage mask (size_px x size_px).
+    Tabler icons are a single color on transparent, so every color variant
+    is just this mask used as alpha under a flat RGB fill.
+    """
+    recolored = recolor_svg(load_svg(icons_dir, style, slug), b"#000000")
+    img = render_svg_to_qimage(recolored, size_px, QImage.Format_Alpha8)
     stride = img.bytesPerLine()
-    mv = img.bits()
-    buf = bytes(mv)
-    # Remove any per-row padding so Pillow sees a tight RGBA buffer
-    tight = bytearray(width * height * 4)
-    row_len = width * 4
-    for y in range(height):
-        tight[y * row_len:(y + 1) * row_len] = buf[y * stride:y * stride + row_len]
-    return Image.frombytes("RGBA", (width, height), bytes(tight))
-
-def save_qimage_png(img: QImage, path: Path):
-    pil = qimage_to_pillow(img)
-    pil.save(path, "PNG")
-
-def write_raw_rgba_from_qimage(img: QImage, rgba_path: Path):
-    pil = qimage_to_pillow(img)
-    rgba_path.write_bytes(pil.tobytes("raw", "RGBA"))
+    arr = np.frombuffer(img.constBits(), dtype=np.uint8, count=stride * size_px).reshape(size_px, stride)
+    return arr[:, :size_px].copy()
+
+def tint_mask(mask: np.ndarray, rgb: tuple) -> np.ndarray:
+    """
+    Build a (size, size, 4) RGBA array: flat rgb color with mask as alpha.
+    Fully transparent pixels stay (0, 0, 0, 0), as in Qt's RGBA8888 renders.
+    """
+    size_px = mask.shape[0]
+    rgba = np.empty((size_px, size_px, 4), np.uint8)
+    rgba[..., :3] = rgb
+    rgba[..., 3] = mask
+    rgba[mask == 0] = 0
+    return rgba
+
+def write_raw_bytes(path: Path, data) -> None:
+    """Write data with a bare open/write/close (no Path.write_bytes wrapper)."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+def compose_strip(icons, size_px, padding) -> Image.Image:
+    """
+    Lay icons (PIL images or (size, size, 4) arrays) out left to right with
+    transparent gap columns between them. Cells never overlap and the background
+    is already zero, so each icon is a straight copy into its column slot.
+    """
+    n = len(icons)
+    sheet = np.zeros((size_px, n * size_px + max(0, n - 1) * padding, 4), np.uint8)
+    offsets = np.arange(n) * (size_px + padding)
+    for i, icon in enumerate(icons):
+        if isinstance(icon, Image.Image):
+            icon = np.asarray(icon.convert("RGBA"))
+        sheet[:, offsets[i]:offsets[i] + size_px] = icon
+    return Image.fromarray(sheet, "RGBA")
 
 def build_sprite_sheet(pil_images, kinds, size_px, padding, out_png: Path, out_json: Path):
     """
     Simple horizontal strip sprite.
     padding pixels between icons, transparent background.
     """
-    n = len(pil_images)
     cell = size_px
-    width = n * cell + max(0, n - 1) * padding
-    height = cell
-    sheet = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    sheet = compose_strip(pil_images, cell, padding)
 
     mapping = {}
     x = 0
-    for idx, (kind, img) in enumerate(zip(kinds, pil_images)):
-        sheet.paste(img, (x, 0))
+    for idx, kind in enumerate(kinds):
         mapping[kind] = {"x": x, "y": 0, "w": cell, "h": cell, "index": idx}
         x += cell + padding
 
     sheet.save(out_png, "PNG")
-    out_json.write_text(json.dumps({"image": out_png.name, "size": cell, "padding": padding, "map": mapping}, indent=2))
+    sprite_map = {"image": out_png.name, "size": cell, "padding": padding, "map": mapping}
+    if orjson is not None:
+        out_json.write_bytes(orjson.dumps(sprite_map, option=orjson.OPT_INDENT_2))
+    else:
+        out_json.write_text(json.dumps(sprite_map, indent=2))
+
+_FONTS = None
+
+def _get_fonts():
+    """Load the (header, label) fonts once, falling back to Pillow's default."""
+    global _FONTS
+    if _FONTS is None:
+        try:
+            _FONTS = (ImageFont.truetype("arial.ttf", 20), ImageFont.truetype("arial.ttf", 14))
+        except OSError:
+            default = ImageFont.load_default()
+            _FONTS = (default, default)
+    return _FONTS
 
 def build_combined_visualization(sprites_dict, size_px, output_path: Path):
     """
@@ -227,8 +305,6 @@ def build_combined_visualization(sprites_dict, size_px, output_path: Path):
     - Section 1: "OUTLINE STYLE" + 4 theme rows
     - Section 2: "FILLED STYLE" + 4 theme rows
     """
-    from PIL import ImageDraw, ImageFont
-
     # Layout constants
     LABEL_WIDTH = 150
     SECTION_HEADER_HEIGHT = 40
@@ -249,17 +325,11 @@ def build_combined_visualization(sprites_dict, size_px, output_path: Path):
                     SECTION_HEADER_HEIGHT + num_themes * THEME_ROW_HEIGHT +  # Filled section
                     TOP_MARGIN)
 
-    # Create white background
-    combined = Image.new("RGB", (total_width, total_height), (255, 255, 255))
+    # Create white background (RGBA so sprites can be alpha-pasted directly)
+    combined = Image.new("RGBA", (total_width, total_height), (255, 255, 255, 255))
     draw = ImageDraw.Draw(combined)
 
-    # Try to load a larger font, fall back to default
-    try:
-        header_font = ImageFont.truetype("arial.ttf", 20)
-        label_font = ImageFont.truetype("arial.ttf", 14)
-    except:
-        header_font = ImageFont.load_default()
-        label_font = ImageFont.load_default()
+    header_font, label_font = _get_fonts()
 
     y_pos = TOP_MARGIN
 
@@ -276,15 +346,11 @@ def build_combined_visualization(sprites_dict, size_px, output_path: Path):
             label_y = y_pos + (THEME_ROW_HEIGHT - size_px) // 2
             draw.text((LEFT_MARGIN, label_y), theme.capitalize(), fill=(0, 0, 0), font=label_font)
 
-            # Paste sprite (need to convert RGBA to RGB for white background)
+            # Paste sprite using its own alpha as the mask
             sprite = sprites_dict[style][theme]
             sprite_x = LEFT_MARGIN + LABEL_WIDTH
             sprite_y = y_pos + (THEME_ROW_HEIGHT - size_px) // 2
-
-            # Convert RGBA sprite to RGB by compositing on white
-            sprite_rgb = Image.new("RGB", sprite.size, (255, 255, 255))
-            sprite_rgb.paste(sprite, (0, 0), sprite)
-            combined.paste(sprite_rgb, (sprite_x, sprite_y))
+            combined.paste(sprite, (sprite_x, sprite_y), sprite)
 
             y_pos += THEME_ROW_HEIGHT
 
@@ -292,15 +358,15 @@ def build_combined_visualization(sprites_dict, size_px, output_path: Path):
         if style_idx < 1:
             y_pos += SECTION_GAP
 
-    # Save combined visualization
-    combined.save(output_path, "PNG")
+    # Save combined visualization, flattened to RGB once
+    combined.convert("RGB").save(output_path, "PNG")
     print(f"Created combined visualization: {output_path}")
 
 def main():
     parser = argparse.ArgumentParser(description="Generate combined theme visualization from Tabler SVG icons")
     parser.add_argument("--icons-dir", required=True, help="Path to Tabler SVG icons folder")
     parser.add_argument("--size", type=int, default=16, help="Icon size in pixels")
-    parser.add_argument("--fallback-color", default="#231f20", help="Used if a kind has no color")
+    parser.add_argument("--fallback-color", default=DEFAULT_COLOR, help="Used if a kind has no color")
     args = parser.parse_args()
 
     # Hardcoded sprite padding
@@ -313,58 +379,58 @@ def main():
 
 
 
+    fallback_rgb = color_to_rgb(args.fallback_color)
+
+    # Build the full work list up front, in the stable (style, theme, kind) order
+    styles = ["outline", "filled"]
+    jobs = {}
+    for style in styles:
+        for theme in sorted(THEMES.keys()):
+            kinds = []
+            # Stable order by kind name
+            for kind in sorted(THEMES[theme].keys()):
+                slug, rgb = _FLAT[(theme, kind)]
+                kinds.append((kind, slug, rgb or fallback_rgb))
+            jobs[(style, theme)] = kinds
+
+    # Rasterize each distinct (style, slug) mask once (render_mask is cached) and
+    # tint it for every (style, slug, color) variant. This runs in-process: the
+    # whole set takes tens of milliseconds, less than starting one worker process.
+    rendered = {}
+    for (style, _), kinds in jobs.items():
+        for _, slug, rgb in kinds:
+            key = (style, slug, rgb)
+            if key not in rendered:
+                rendered[key] = tint_mask(render_mask(icons_dir, style, slug, args.size), rgb)
+
     # Collect all sprites organized by style and theme
     sprites = {}
 
-    for style in ["outline","filled"]:
+    for style in styles:
         sprites[style] = {}
 
         for theme in sorted(THEMES.keys()):
-            rendered_pil = []
-            kinds_in_order = []
+            icon_arrs = []
             out_dir = Path(f"{theme}_{style}")
             out_dir.mkdir(parents=True, exist_ok=True)
 
-            KIND_TO_TABLER = THEMES[theme]
-            # Stable order by kind name
-            for kind in sorted(KIND_TO_TABLER.keys()):
-                spec = KIND_TO_TABLER[kind]
-                slug = spec["slug"]
-                color = spec.get("color", args.fallback_color)
-
-                svg_path = svg_path_for_slug(icons_dir / style, slug)
-                if not svg_path.exists():
-                    svg_path = svg_path_for_slug(icons_dir / "outline", slug)
-
-                raw_svg = svg_path.read_bytes()
-                recolored = recolor_svg(raw_svg, color, args.size)
-                img = render_svg_to_qimage(recolored, args.size)
+            for kind, slug, rgb in jobs[(style, theme)]:
+                icon_arr = rendered[(style, slug, rgb)]
 
                 # Write individual RGBA file
                 rgba_path = out_dir / f"{kind}.rgba"
-                write_raw_rgba_from_qimage(img, rgba_path)
+                data = icon_arr.tobytes()
+                write_raw_bytes(rgba_path, data)
                 expected = args.size * args.size * 4
-                actual = rgba_path.stat().st_size
+                actual = len(data)
                 if actual != expected:
                     print(f"Warning: {rgba_path.name} size {actual} vs expected {expected}")
                 print(f"Wrote {rgba_path}")
 
-                # Convert to PIL and collect for sprite
-                pil_img = qimage_to_pillow(img)
-                rendered_pil.append(pil_img)
-                kinds_in_order.append(kind)
+                icon_arrs.append(icon_arr)
 
             # Build sprite for this theme
-            sprite_width = len(rendered_pil) * args.size + max(0, len(rendered_pil) - 1) * sprite_padding
-            sprite_height = args.size
-            sprite = Image.new("RGBA", (sprite_width, sprite_height), (0, 0, 0, 0))
-
-            x = 0
-            for img in rendered_pil:
-                sprite.paste(img, (x, 0))
-                x += args.size + sprite_padding
-
-            sprites[style][theme] = sprite
+            sprites[style][theme] = compose_strip(icon_arrs, args.size, sprite_padding)
             print(f"Generated sprite for {theme} ({style})")
 
     # Build combined visualization
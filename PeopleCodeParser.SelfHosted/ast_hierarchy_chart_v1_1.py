@@ -8,357 +8,456 @@ Based on V1 with targeted fixes:
 - Keep the clean, organized layout from V1
 """
 
-import graphviz
+import argparse
+import hashlib
+import io
 import os
-from typing import Dict, List, Tuple
+import subprocess
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
-def create_ast_hierarchy_chart():
-    """Create AST hierarchy chart v1.1 - V1 with targeted improvements."""
-    
-    # Create a new directed graph with V1's successful attributes
-    dot = graphviz.Digraph(
-        name='ast_hierarchy_v1_1',
-        comment='PeopleCode Self-Hosted Parser AST Node Hierarchy v1.1',
-        format='svg'
-    )
-    
-    # Keep V1's proven layout settings
-    dot.attr(
-        rankdir='TB',  # Top to bottom layout
-        size='12,8',   # Max size in inches (roughly 1200x800px)
-        ratio='compress',
-        bgcolor='white',
-        fontname='Arial',
-        fontsize='10',
-        splines='ortho',  # Keep orthogonal edges but with better routing
-        nodesep='0.3',   # V1's spacing
-        ranksep='0.4',   # V1's spacing
-        concentrate='false'  # Don't merge edges for clearer routing
-    )
-    
-    # Keep V1's successful node styles exactly
-    node_styles = {
-        'root': {
-            'shape': 'box',
-            'style': 'filled,bold',
-            'fillcolor': '#4CAF50',
-            'fontcolor': 'white',
-            'fontsize': '12'
-        },
-        'program_component': {
-            'shape': 'box',
-            'style': 'filled',
-            'fillcolor': '#2196F3',
-            'fontcolor': 'white',
-            'fontsize': '10'
-        },
-        'declaration': {
-            'shape': 'box',
-            'style': 'filled',
-            'fillcolor': '#FF9800',
-            'fontcolor': 'white',
-            'fontsize': '9'
-        },
-        'statement': {
-            'shape': 'ellipse',
-            'style': 'filled',
-            'fillcolor': '#9C27B0',
-            'fontcolor': 'white',
-            'fontsize': '9'
-        },
-        'expression': {
-            'shape': 'diamond',
-            'style': 'filled',
-            'fillcolor': '#E91E63',
-            'fontcolor': 'white',
-            'fontsize': '9'
-        },
-        'type': {
-            'shape': 'hexagon',
-            'style': 'filled',
-            'fillcolor': '#607D8B',
-            'fontcolor': 'white',
-            'fontsize': '9'
-        },
-        'utility': {
-            'shape': 'box',
-            'style': 'filled,dashed',
-            'fillcolor': '#FFC107',
-            'fontcolor': 'black',
-            'fontsize': '8'
-        }
-    }
-    
-    # Keep V1's edge styles, add one for control flow
-    edge_styles = {
-        'contains': {'color': 'blue', 'style': 'solid', 'arrowhead': 'diamond'},
-        'implements': {'color': 'green', 'style': 'dashed', 'arrowhead': 'empty'},
-        'references': {'color': 'gray', 'style': 'dotted', 'arrowhead': 'vee'},
-        'control_flow': {'color': 'purple', 'style': 'solid', 'arrowhead': 'normal'}  # New for break/continue
+def _quote(value: str) -> str:
+    """Quote a DOT ID/attribute value, keeping escapes like \\n intact."""
+    return '"' + value.replace('"', '\\"') + '"'
+
+def _format_attrs(attrs: Dict[str, str]) -> str:
+    """Format an attribute dict as a DOT attribute list body."""
+    return ' '.join(f'{key}={_quote(value)}' for key, value in attrs.items())
+
+class NodeSpec(NamedTuple):
+    """A chart node: its DOT ID, style category and label."""
+    id: str
+    style_key: int
+    label: str
+
+class EdgeSpec(NamedTuple):
+    """A chart relationship between two node IDs."""
+    src: str
+    dst: str
+    rel_type: str
+
+# Node style categories, used as indices into the style tuples below
+STYLE_ROOT, STYLE_PROGRAM, STYLE_DECL, STYLE_STMT, STYLE_EXPR, STYLE_TYPE, STYLE_UTIL = range(7)
+
+# Keep V1's successful node styles exactly (ordered by STYLE_* index)
+_NODE_STYLES = (
+    {  # STYLE_ROOT
+        'shape': 'box',
+        'style': 'filled,bold',
+        'fillcolor': '#4CAF50',
+        'fontcolor': 'white',
+        'fontsize': '12'
+    },
+    {  # STYLE_PROGRAM
+        'shape': 'box',
+        'style': 'filled',
+        'fillcolor': '#2196F3',
+        'fontcolor': 'white',
+        'fontsize': '10'
+    },
+    {  # STYLE_DECL
+        'shape': 'box',
+        'style': 'filled',
+        'fillcolor': '#FF9800',
+        'fontcolor': 'white',
+        'fontsize': '9'
+    },
+    {  # STYLE_STMT
+        'shape': 'ellipse',
+        'style': 'filled',
+        'fillcolor': '#9C27B0',
+        'fontcolor': 'white',
+        'fontsize': '9'
+    },
+    {  # STYLE_EXPR
+        'shape': 'diamond',
+        'style': 'filled',
+        'fillcolor': '#E91E63',
+        'fontcolor': 'white',
+        'fontsize': '9'
+    },
+    {  # STYLE_TYPE
+        'shape': 'hexagon',
+        'style': 'filled',
+        'fillcolor': '#607D8B',
+        'fontcolor': 'white',
+        'fontsize': '9'
+    },
+    {  # STYLE_UTIL
+        'shape': 'box',
+        'style': 'filled,dashed',
+        'fillcolor': '#FFC107',
+        'fontcolor': 'black',
+        'fontsize': '8'
     }
+)
+
+# Keep V1's edge styles, add one for control flow
+_EDGE_STYLES = {
+    'contains': {'color': 'blue', 'style': 'solid', 'arrowhead': 'diamond'},
+    'implements': {'color': 'green', 'style': 'dashed', 'arrowhead': 'empty'},
+    'references': {'color': 'gray', 'style': 'dotted', 'arrowhead': 'vee'},
+    'control_flow': {'color': 'purple', 'style': 'solid', 'arrowhead': 'normal'}  # New for break/continue
+}
+
+# Keep V1's successful node definitions with minor additions
+_NODES = (
+    # Root node - same as V1
+    NodeSpec('ProgramNode', STYLE_ROOT, 'ProgramNode\\n(Root)\\n\\n• Imports[]\\n• AppClass?\\n• Interface?\\n• Functions[]\\n• Variables[]\\n• Constants[]\\n• MainBlock?'),
+
+    # Program-level components (second tier) - same as V1
+    NodeSpec('ImportNode', STYLE_PROGRAM, 'ImportNode\\n\\n• PackagePath[]\\n• ClassName?\\n• ImportedType'),
+    NodeSpec('AppClassNode', STYLE_PROGRAM, 'AppClassNode\\n\\n• Name\\n• Methods[]\\n• Properties[]\\n• InstanceVars[]\\n• Constants[]\\n• BaseClass?\\n• ImplementedInterface?'),
+    NodeSpec('InterfaceNode', STYLE_PROGRAM, 'InterfaceNode\\n\\n• Name\\n• Methods[]\\n• Properties[]\\n• BaseInterface?'),
+    NodeSpec('FunctionNode', STYLE_PROGRAM, 'FunctionNode\\n\\n• Name\\n• Parameters[]\\n• ReturnType?\\n• Body?\\n• FunctionType'),
+
+    # Declaration nodes (third tier) - same as V1
+    NodeSpec('MethodNode', STYLE_DECL, 'MethodNode\\n\\n• Name\\n• Parameters[]\\n• ReturnType?\\n• Implementation?\\n• IsAbstract\\n• IsConstructor'),
+    NodeSpec('PropertyNode', STYLE_DECL, 'PropertyNode\\n\\n• Name\\n• Type\\n• HasGet/HasSet\\n• GetterImpl?\\n• SetterImpl?'),
+    NodeSpec('VariableNode', STYLE_DECL, 'VariableNode\\n\\n• Name\\n• Type\\n• Scope\\n• InitialValue?\\n• AdditionalNames[]'),
+    NodeSpec('ConstantNode', STYLE_DECL, 'ConstantNode\\n\\n• Name\\n• Value'),
+    NodeSpec('ParameterNode', STYLE_DECL, 'ParameterNode\\n\\n• Name\\n• Type\\n• IsOut\\n• Mode'),
+    NodeSpec('MethodImplNode', STYLE_DECL, 'MethodImplNode\\n\\n• Name\\n• Body\\n• ParameterAnnotations[]\\n• ReturnTypeAnnotation?'),
+
+    # Core statement nodes - same as V1
+    NodeSpec('BlockNode', STYLE_STMT, 'BlockNode\\n\\n• Statements[]\\n• IntroducesScope'),
+    NodeSpec('IfStatementNode', STYLE_STMT, 'IfStatementNode\\n\\n• Condition\\n• ThenBlock\\n• ElseBlock?'),
+    NodeSpec('ForStatementNode', STYLE_STMT, 'ForStatementNode\\n\\n• Variable\\n• FromValue\\n• ToValue\\n• StepValue?\\n• Body'),
+    NodeSpec('WhileStatementNode', STYLE_STMT, 'WhileStatementNode\\n\\n• Condition\\n• Body'),
+    NodeSpec('RepeatStatementNode', STYLE_STMT, 'RepeatStatementNode\\n\\n• Body\\n• Condition'),
+    NodeSpec('EvaluateStatementNode', STYLE_STMT, 'EvaluateStatementNode\\n\\n• Expression\\n• WhenClauses[]\\n• WhenOtherBlock?'),
+    NodeSpec('TryStatementNode', STYLE_STMT, 'TryStatementNode\\n\\n• TryBlock\\n• CatchClauses[]'),
+
+    # Control flow statements
+    NodeSpec('ReturnStatementNode', STYLE_STMT, 'ReturnStatementNode\\n\\n• Value?\\n• DoesTransferControl'),
+    NodeSpec('ThrowStatementNode', STYLE_STMT, 'ThrowStatementNode\\n\\n• Exception\\n• DoesTransferControl'),
+    NodeSpec('BreakStatementNode', STYLE_STMT, 'BreakStatementNode\\n\\n• DoesTransferControl'),
+    NodeSpec('ContinueStatementNode', STYLE_STMT, 'ContinueStatementNode\\n\\n• DoesTransferControl'),
+    NodeSpec('ExpressionStatementNode', STYLE_STMT, 'ExpressionStatementNode\\n\\n• Expression'),
+    NodeSpec('LocalVariableDeclarationNode', STYLE_STMT, 'LocalVariableDeclarationNode\\n\\n• Type\\n• VariableNames[]'),
+
+    # Key expression nodes - same as V1
+    NodeSpec('BinaryOperationNode', STYLE_EXPR, 'BinaryOperationNode\\n\\n• Left\\n• Operator\\n• Right\\n• NotFlag'),
+    NodeSpec('MethodCallNode', STYLE_EXPR, 'MethodCallNode\\n\\n• Object?\\n• MethodName\\n• Arguments[]'),
+    NodeSpec('LiteralNode', STYLE_EXPR, 'LiteralNode\\n\\n• Value\\n• LiteralType'),
+    NodeSpec('IdentifierNode', STYLE_EXPR, 'IdentifierNode\\n\\n• Name\\n• IsLValue'),
+    NodeSpec('ArrayAccessNode', STYLE_EXPR, 'ArrayAccessNode\\n\\n• Array\\n• Indices[]\\n• IsLValue'),
+    NodeSpec('PropertyAccessNode', STYLE_EXPR, 'PropertyAccessNode\\n\\n• Object\\n• PropertyName\\n• IsLValue'),
+
+    # Type nodes - same as V1
+    NodeSpec('TypeNode', STYLE_TYPE, 'TypeNode\\n(Abstract Base)\\n\\n• TypeName\\n• IsNullable\\n• IsBuiltIn'),
+    NodeSpec('BuiltInTypeNode', STYLE_TYPE, 'BuiltInTypeNode\\n\\n• Type\\n• IsBuiltIn=true'),
+    NodeSpec('ArrayTypeNode', STYLE_TYPE, 'ArrayTypeNode\\n\\n• Dimensions\\n• ElementType?'),
+    NodeSpec('AppClassTypeNode', STYLE_TYPE, 'AppClassTypeNode\\n\\n• PackagePath[]\\n• ClassName'),
+
+    # Utility nodes - same as V1
+    NodeSpec('CatchStatementNode', STYLE_UTIL, 'CatchStatementNode\\n\\n• ExceptionVariable?\\n• ExceptionType?\\n• Body'),
+    NodeSpec('WhenClause', STYLE_UTIL, 'WhenClause\\n\\n• Condition\\n• Body\\n• Operator?'),
+)
+
+# Keep most of V1's relationships, with targeted fixes
+_RELATIONSHIPS = (
+    # Program root contains major components - keep V1's structure
+    EdgeSpec('ProgramNode', 'ImportNode', 'contains'),
+    EdgeSpec('ProgramNode', 'AppClassNode', 'contains'),
+    EdgeSpec('ProgramNode', 'InterfaceNode', 'contains'),
+    EdgeSpec('ProgramNode', 'FunctionNode', 'contains'),
+    EdgeSpec('ProgramNode', 'VariableNode', 'contains'),
+    EdgeSpec('ProgramNode', 'ConstantNode', 'contains'),
+    EdgeSpec('ProgramNode', 'BlockNode', 'contains'),  # MainBlock
+
+    # Class/Interface structure - same as V1
+    EdgeSpec('AppClassNode', 'MethodNode', 'contains'),
+    EdgeSpec('AppClassNode', 'PropertyNode', 'contains'),
+    EdgeSpec('AppClassNode', 'VariableNode', 'contains'),
+    EdgeSpec('AppClassNode', 'ConstantNode', 'contains'),
+    EdgeSpec('InterfaceNode', 'MethodNode', 'contains'),
+    EdgeSpec('InterfaceNode', 'PropertyNode', 'contains'),
+
+    # Method/Function structure - same as V1
+    EdgeSpec('FunctionNode', 'ParameterNode', 'contains'),
+    EdgeSpec('FunctionNode', 'TypeNode', 'references'),  # ReturnType
+    EdgeSpec('FunctionNode', 'BlockNode', 'contains'),   # Body
+    EdgeSpec('MethodNode', 'ParameterNode', 'contains'),
+    EdgeSpec('MethodNode', 'TypeNode', 'references'),    # ReturnType
+    EdgeSpec('MethodNode', 'MethodImplNode', 'implements'),
+
+    # Implementation structure - same as V1
+    EdgeSpec('MethodImplNode', 'BlockNode', 'contains'), # Body
+    EdgeSpec('PropertyNode', 'TypeNode', 'references'),
+    EdgeSpec('PropertyNode', 'MethodImplNode', 'contains'), # Getter/Setter
+    EdgeSpec('VariableNode', 'TypeNode', 'references'),
+    EdgeSpec('ParameterNode', 'TypeNode', 'references'),
+
+    # Block contains statements - same as V1
+    EdgeSpec('BlockNode', 'IfStatementNode', 'contains'),
+    EdgeSpec('BlockNode', 'ForStatementNode', 'contains'),
+    EdgeSpec('BlockNode', 'WhileStatementNode', 'contains'),
+    EdgeSpec('BlockNode', 'RepeatStatementNode', 'contains'),
+    EdgeSpec('BlockNode', 'EvaluateStatementNode', 'contains'),
+    EdgeSpec('BlockNode', 'TryStatementNode', 'contains'),
+    EdgeSpec('BlockNode', 'ReturnStatementNode', 'contains'),
+    EdgeSpec('BlockNode', 'ThrowStatementNode', 'contains'),
+    EdgeSpec('BlockNode', 'ExpressionStatementNode', 'contains'),
+    EdgeSpec('BlockNode', 'LocalVariableDeclarationNode', 'contains'),
+
+    # FIX: Connect control flow statements to loop constructs where they can be used
+    EdgeSpec('ForStatementNode', 'BreakStatementNode', 'control_flow'),
+    EdgeSpec('ForStatementNode', 'ContinueStatementNode', 'control_flow'),
+    EdgeSpec('WhileStatementNode', 'BreakStatementNode', 'control_flow'),
+    EdgeSpec('WhileStatementNode', 'ContinueStatementNode', 'control_flow'),
+    EdgeSpec('RepeatStatementNode', 'BreakStatementNode', 'control_flow'),
+    EdgeSpec('RepeatStatementNode', 'ContinueStatementNode', 'control_flow'),
+    EdgeSpec('EvaluateStatementNode', 'BreakStatementNode', 'control_flow'),
+
+    # Control structures contain blocks/expressions - same as V1
+    EdgeSpec('IfStatementNode', 'BinaryOperationNode', 'references'), # Condition
+    EdgeSpec('IfStatementNode', 'BlockNode', 'contains'),
+    EdgeSpec('ForStatementNode', 'BlockNode', 'contains'),
+    EdgeSpec('WhileStatementNode', 'BlockNode', 'contains'),
+    EdgeSpec('RepeatStatementNode', 'BlockNode', 'contains'),
+    EdgeSpec('EvaluateStatementNode', 'WhenClause', 'contains'),
+    EdgeSpec('TryStatementNode', 'CatchStatementNode', 'contains'),
+
+    # Expression relationships - same as V1
+    EdgeSpec('ExpressionStatementNode', 'BinaryOperationNode', 'contains'),
+    EdgeSpec('ExpressionStatementNode', 'MethodCallNode', 'contains'),
+    EdgeSpec('ExpressionStatementNode', 'IdentifierNode', 'contains'),
+    EdgeSpec('BinaryOperationNode', 'LiteralNode', 'references'),
+    EdgeSpec('BinaryOperationNode', 'IdentifierNode', 'references'),
+    EdgeSpec('MethodCallNode', 'IdentifierNode', 'references'),
+    EdgeSpec('ArrayAccessNode', 'IdentifierNode', 'references'),
+    EdgeSpec('PropertyAccessNode', 'IdentifierNode', 'references'),
+
+    # Type hierarchy - same as V1
+    EdgeSpec('BuiltInTypeNode', 'TypeNode', 'implements'),
+    EdgeSpec('ArrayTypeNode', 'TypeNode', 'implements'),
+    EdgeSpec('AppClassTypeNode', 'TypeNode', 'implements'),
+    EdgeSpec('ArrayTypeNode', 'TypeNode', 'references'), # ElementType
+
+    # Import relationships - same as V1
+    EdgeSpec('ImportNode', 'TypeNode', 'references'), # ImportedType
+)
+
+# Node IDs, labels and edge endpoints are static: quote/escape them once at
+# import so the chart builder only concatenates DOT-ready strings. Labels keep
+# their centered line breaks.
+_ESCAPED_NODES = tuple(n._replace(id=_quote(n.id), label=_quote(n.label)) for n in _NODES)
+_ESCAPED_RELATIONSHIPS = tuple(e._replace(src=_quote(e.src), dst=_quote(e.dst)) for e in _RELATIONSHIPS)
+
+# Format each style's attribute list once instead of once per node/edge
+_NODE_ATTR_STRS = tuple(_format_attrs(style) for style in _NODE_STYLES)
+_EDGE_ATTR_STRS = {key: _format_attrs(style) for key, style in _EDGE_STYLES.items()}
+
+# Keep V1's proven layout settings
+_GRAPH_ATTRS = {
+    'rankdir': 'TB',  # Top to bottom layout
+    'size': '12,8',   # Max size in inches (roughly 1200x800px)
+    'ratio': 'compress',
+    'bgcolor': 'white',
+    'fontname': 'Arial',
+    'fontsize': '10',
+    'nodesep': '0.3',   # V1's spacing
+    'ranksep': '0.4',   # V1's spacing
+    'concentrate': 'false'  # Don't merge edges for clearer routing
+}
+
+# Above this many nodes, full `dot` layout gets slow: default to `sfdp`, and if
+# `dot` is still requested, bound its network-simplex/mincross iterations.
+# These thresholds are measured against the module's own _NODES table (36 nodes
+# today), so the large-graph branches only take effect once it grows past them.
+LARGE_GRAPH_NODE_COUNT = 100
+_BOUNDED_DOT_ATTRS = {'nslimit': '1.0', 'nslimit1': '1.0', 'mclimit': '1.0'}
+
+# Above this many nodes, orthogonal edge routing dominates layout time: use straight lines
+STRAIGHT_EDGE_NODE_COUNT = 80
+
+# Keep V1's successful subgraph clustering: (name, attributes, member node IDs)
+_CLUSTERS = (
+    ('cluster_program', {'label': 'Program Structure', 'style': 'dashed', 'color': 'blue'}, (
+        'ProgramNode', 'ImportNode', 'AppClassNode', 'InterfaceNode', 'FunctionNode',
+    )),
+    ('cluster_declarations', {'label': 'Declarations', 'style': 'dashed', 'color': 'orange'}, (
+        'MethodNode', 'PropertyNode', 'VariableNode', 'ConstantNode', 'ParameterNode', 'MethodImplNode',
+    )),
+    ('cluster_statements', {'label': 'Statements', 'style': 'dashed', 'color': 'purple'}, (
+        'BlockNode', 'IfStatementNode', 'ForStatementNode', 'WhileStatementNode',
+        'RepeatStatementNode', 'EvaluateStatementNode', 'TryStatementNode',
+        'ReturnStatementNode', 'ThrowStatementNode',
+        'BreakStatementNode',        # Now connected!
+        'ContinueStatementNode',     # Now connected!
+        'ExpressionStatementNode', 'LocalVariableDeclarationNode',
+    )),
+    ('cluster_expressions', {'label': 'Expressions', 'style': 'dashed', 'color': 'red', 'margin': '20'}, (
+        'BinaryOperationNode', 'MethodCallNode', 'LiteralNode', 'IdentifierNode',
+        'ArrayAccessNode', 'PropertyAccessNode',
+    )),
+    ('cluster_types', {'label': 'Types', 'style': 'dashed', 'color': 'gray'}, (
+        'TypeNode', 'BuiltInTypeNode', 'ArrayTypeNode', 'AppClassTypeNode',
+    )),
+)
+
+# The cluster block is static: each cluster asserts membership of the already
+# declared nodes in a single statement rather than re-declaring them one by one
+_CLUSTER_BLOCK = ''.join(
+    f'\tsubgraph {name} {{\n'
+    f'\t\tgraph [{_format_attrs(attrs)}]\n'
+    f'\t\t{"; ".join(_quote(member) for member in members)};\n'
+    '\t}\n'
+    for name, attrs, members in _CLUSTERS
+)
+
+# Legend, drawn as its own cluster inside the chart: (node ID, label, attributes)
+_LEGEND_NODES = (
+    ('root_legend', 'Root Node\\n(ProgramNode)',
+     {'shape': 'box', 'style': 'filled,bold', 'fillcolor': '#4CAF50', 'fontcolor': 'white'}),
+    ('program_legend', 'Program Components\\n(Import, Class, etc.)',
+     {'shape': 'box', 'style': 'filled', 'fillcolor': '#2196F3', 'fontcolor': 'white'}),
+    ('declaration_legend', 'Declarations\\n(Method, Property, etc.)',
+     {'shape': 'box', 'style': 'filled', 'fillcolor': '#FF9800', 'fontcolor': 'white'}),
+    ('statement_legend', 'Statements\\n(If, For, Block, etc.)',
+     {'shape': 'ellipse', 'style': 'filled', 'fillcolor': '#9C27B0', 'fontcolor': 'white'}),
+    ('expression_legend', 'Expressions\\n(Binary, Method Call, etc.)',
+     {'shape': 'diamond', 'style': 'filled', 'fillcolor': '#E91E63', 'fontcolor': 'white'}),
+    ('type_legend', 'Types\\n(BuiltIn, Array, etc.)',
+     {'shape': 'hexagon', 'style': 'filled', 'fillcolor': '#607D8B', 'fontcolor': 'white'}),
     
-    # Keep V1's successful node definitions with minor additions
-    nodes = [
-        # Root node - same as V1
-        ('ProgramNode', 'root', 'ProgramNode\\n(Root)\\n\\n• Imports[]\\n• AppClass?\\n• Interface?\\n• Functions[]\\n• Variables[]\\n• Constants[]\\n• MainBlock?'),
-        
-        # Program-level components (second tier) - same as V1
-        ('ImportNode', 'program_component', 'ImportNode\\n\\n• PackagePath[]\\n• ClassName?\\n• ImportedType'),
-        ('AppClassNode', 'program_component', 'AppClassNode\\n\\n• Name\\n• Methods[]\\n• Properties[]\\n• InstanceVars[]\\n• Constants[]\\n• BaseClass?\\n• ImplementedInterface?'),
-        ('InterfaceNode', 'program_component', 'InterfaceNode\\n\\n• Name\\n• Methods[]\\n• Properties[]\\n• BaseInterface?'),
-        ('FunctionNode', 'program_component', 'FunctionNode\\n\\n• Name\\n• Parameters[]\\n• ReturnType?\\n• Body?\\n• FunctionType'),
-        
-        # Declaration nodes (third tier) - same as V1
-        ('MethodNode', 'declaration', 'MethodNode\\n\\n• Name\\n• Parameters[]\\n• ReturnType?\\n• Implementation?\\n• IsAbstract\\n• IsConstructor'),
-        ('PropertyNode', 'declaration', 'PropertyNode\\n\\n• Name\\n• Type\\n• HasGet/HasSet\\n• GetterImpl?\\n• SetterImpl?'),
-        ('VariableNode', 'declaration', 'VariableNode\\n\\n• Name\\n• Type\\n• Scope\\n• InitialValue?\\n• AdditionalNames[]'),
-        ('ConstantNode', 'declaration', 'ConstantNode\\n\\n• Name\\n• Value'),
-        ('ParameterNode', 'declaration', 'ParameterNode\\n\\n• Name\\n• Type\\n• IsOut\\n• Mode'),
-        ('MethodImplNode', 'declaration', 'MethodImplNode\\n\\n• Name\\n• Body\\n• ParameterAnnotations[]\\n• ReturnTypeAnnotation?'),
-        
-        # Core statement nodes - same as V1
-        ('BlockNode', 'statement', 'BlockNode\\n\\n• Statements[]\\n• IntroducesScope'),
-        ('IfStatementNode', 'statement', 'IfStatementNode\\n\\n• Condition\\n• ThenBlock\\n• ElseBlock?'),
-        ('ForStatementNode', 'statement', 'ForStatementNode\\n\\n• Variable\\n• FromValue\\n• ToValue\\n• StepValue?\\n• Body'),
-        ('WhileStatementNode', 'statement', 'WhileStatementNode\\n\\n• Condition\\n• Body'),
-        ('RepeatStatementNode', 'statement', 'RepeatStatementNode\\n\\n• Body\\n• Condition'),
-        ('EvaluateStatementNode', 'statement', 'EvaluateStatementNode\\n\\n• Expression\\n• WhenClauses[]\\n• WhenOtherBlock?'),
-        ('TryStatementNode', 'statement', 'TryStatementNode\\n\\n• TryBlock\\n• CatchClauses[]'),
-        
-        # Control flow statements
-        ('ReturnStatementNode', 'statement', 'ReturnStatementNode\\n\\n• Value?\\n• DoesTransferControl'),
-        ('ThrowStatementNode', 'statement', 'ThrowStatementNode\\n\\n• Exception\\n• DoesTransferControl'),
-        ('BreakStatementNode', 'statement', 'BreakStatementNode\\n\\n• DoesTransferControl'),
-        ('ContinueStatementNode', 'statement', 'ContinueStatementNode\\n\\n• DoesTransferControl'),
-        ('ExpressionStatementNode', 'statement', 'ExpressionStatementNode\\n\\n• Expression'),
-        ('LocalVariableDeclarationNode', 'statement', 'LocalVariableDeclarationNode\\n\\n• Type\\n• VariableNames[]'),
-        
-        # Key expression nodes - same as V1
-        ('BinaryOperationNode', 'expression', 'BinaryOperationNode\\n\\n• Left\\n• Operator\\n• Right\\n• NotFlag'),
-        ('MethodCallNode', 'expression', 'MethodCallNode\\n\\n• Object?\\n• MethodName\\n• Arguments[]'),
-        ('LiteralNode', 'expression', 'LiteralNode\\n\\n• Value\\n• LiteralType'),
-        ('IdentifierNode', 'expression', 'IdentifierNode\\n\\n• Name\\n• IsLValue'),
-        ('ArrayAccessNode', 'expression', 'ArrayAccessNode\\n\\n• Array\\n• Indices[]\\n• IsLValue'),
-        ('PropertyAccessNode', 'expression', 'PropertyAccessNode\\n\\n• Object\\n• PropertyName\\n• IsLValue'),
-        
-        # Type nodes - same as V1
-        ('TypeNode', 'type', 'TypeNode\\n(Abstract Base)\\n\\n• TypeName\\n• IsNullable\\n• IsBuiltIn'),
-        ('BuiltInTypeNode', 'type', 'BuiltInTypeNode\\n\\n• Type\\n• IsBuiltIn=true'),
-        ('ArrayTypeNode', 'type', 'ArrayTypeNode\\n\\n• Dimensions\\n• ElementType?'),
-        ('AppClassTypeNode', 'type', 'AppClassTypeNode\\n\\n• PackagePath[]\\n• ClassName'),
-        
-        # Utility nodes - same as V1
-        ('CatchStatementNode', 'utility', 'CatchStatementNode\\n\\n• ExceptionVariable?\\n• ExceptionType?\\n• Body'),
-        ('WhenClause', 'utility', 'WhenClause\\n\\n• Condition\\n• Body\\n• Operator?'),
-    ]
-    
-    # Add all nodes to the graph
-    for node_id, style_key, label in nodes:
-        dot.node(node_id, label, **node_styles[style_key])
-    
-    # Keep most of V1's relationships, with targeted fixes
-    relationships = [
-        # Program root contains major components - keep V1's structure
-        ('ProgramNode', 'ImportNode', 'contains'),
-        ('ProgramNode', 'AppClassNode', 'contains'),
-        ('ProgramNode', 'InterfaceNode', 'contains'),
-        ('ProgramNode', 'FunctionNode', 'contains'),
-        ('ProgramNode', 'VariableNode', 'contains'),
-        ('ProgramNode', 'ConstantNode', 'contains'),
-        ('ProgramNode', 'BlockNode', 'contains'),  # MainBlock
-        
-        # Class/Interface structure - same as V1
-        ('AppClassNode', 'MethodNode', 'contains'),
-        ('AppClassNode', 'PropertyNode', 'contains'),
-        ('AppClassNode', 'VariableNode', 'contains'),
-        ('AppClassNode', 'ConstantNode', 'contains'),
-        ('InterfaceNode', 'MethodNode', 'contains'),
-        ('InterfaceNode', 'PropertyNode', 'contains'),
-        
-        # Method/Function structure - same as V1
-        ('FunctionNode', 'ParameterNode', 'contains'),
-        ('FunctionNode', 'TypeNode', 'references'),  # ReturnType
-        ('FunctionNode', 'BlockNode', 'contains'),   # Body
-        ('MethodNode', 'ParameterNode', 'contains'),
-        ('MethodNode', 'TypeNode', 'references'),    # ReturnType
-        ('MethodNode', 'MethodImplNode', 'implements'),
-        
-        # Implementation structure - same as V1
-        ('MethodImplNode', 'BlockNode', 'contains'), # Body
-        ('PropertyNode', 'TypeNode', 'references'),
-        ('PropertyNode', 'MethodImplNode', 'contains'), # Getter/Setter
-        ('VariableNode', 'TypeNode', 'references'),
-        ('ParameterNode', 'TypeNode', 'references'),
-        
-        # Block contains statements - same as V1
-        ('BlockNode', 'IfStatementNode', 'contains'),
-        ('BlockNode', 'ForStatementNode', 'contains'),
-        ('BlockNode', 'WhileStatementNode', 'contains'),
-        ('BlockNode', 'RepeatStatementNode', 'contains'),
-        ('BlockNode', 'EvaluateStatementNode', 'contains'),
-        ('BlockNode', 'TryStatementNode', 'contains'),
-        ('BlockNode', 'ReturnStatementNode', 'contains'),
-        ('BlockNode', 'ThrowStatementNode', 'contains'),
-        ('BlockNode', 'ExpressionStatementNode', 'contains'),
-        ('BlockNode', 'LocalVariableDeclarationNode', 'contains'),
-        
-        # FIX: Connect control flow statements to loop constructs where they can be used
-        ('ForStatementNode', 'BreakStatementNode', 'control_flow'),
-        ('ForStatementNode', 'ContinueStatementNode', 'control_flow'),
-        ('WhileStatementNode', 'BreakStatementNode', 'control_flow'),
-        ('WhileStatementNode', 'ContinueStatementNode', 'control_flow'),
-        ('RepeatStatementNode', 'BreakStatementNode', 'control_flow'),
-        ('RepeatStatementNode', 'ContinueStatementNode', 'control_flow'),
-        ('EvaluateStatementNode', 'BreakStatementNode', 'control_flow'),
-        
-        # Control structures contain blocks/expressions - same as V1
-        ('IfStatementNode', 'BinaryOperationNode', 'references'), # Condition
-        ('IfStatementNode', 'BlockNode', 'contains'),
-        ('ForStatementNode', 'BlockNode', 'contains'),
-        ('WhileStatementNode', 'BlockNode', 'contains'),
-        ('RepeatStatementNode', 'BlockNode', 'contains'),
-        ('EvaluateStatementNode', 'WhenClause', 'contains'),
-        ('TryStatementNode', 'CatchStatementNode', 'contains'),
-        
-        # Expression relationships - same as V1
-        ('ExpressionStatementNode', 'BinaryOperationNode', 'contains'),
-        ('ExpressionStatementNode', 'MethodCallNode', 'contains'),
-        ('ExpressionStatementNode', 'IdentifierNode', 'contains'),
-        ('BinaryOperationNode', 'LiteralNode', 'references'),
-        ('BinaryOperationNode', 'IdentifierNode', 'references'),
-        ('MethodCallNode', 'IdentifierNode', 'references'),
-        ('ArrayAccessNode', 'IdentifierNode', 'references'),
-        ('PropertyAccessNode', 'IdentifierNode', 'references'),
-        
-        # Type hierarchy - same as V1
-        ('BuiltInTypeNode', 'TypeNode', 'implements'),
-        ('ArrayTypeNode', 'TypeNode', 'implements'),
-        ('AppClassTypeNode', 'TypeNode', 'implements'),
-        ('ArrayTypeNode', 'TypeNode', 'references'), # ElementType
-        
-        # Import relationships - same as V1
-        ('ImportNode', 'TypeNode', 'references'), # ImportedType
-    ]
-    
-    # Add relationships to graph
-    for source, target, rel_type in relationships:
-        dot.edge(source, target, **edge_styles[rel_type])
-    
-    # Keep V1's successful subgraph clustering
-    with dot.subgraph(name='cluster_program') as c:
-        c.attr(label='Program Structure', style='dashed', color='blue')
-        c.node('ProgramNode')
-        c.node('ImportNode') 
-        c.node('AppClassNode')
-        c.node('InterfaceNode')
-        c.node('FunctionNode')
-    
-    with dot.subgraph(name='cluster_declarations') as c:
-        c.attr(label='Declarations', style='dashed', color='orange')
-        c.node('MethodNode')
-        c.node('PropertyNode')
-        c.node('VariableNode')
-        c.node('ConstantNode')
-        c.node('ParameterNode')
-        c.node('MethodImplNode')
-    
-    with dot.subgraph(name='cluster_statements') as c:
-        c.attr(label='Statements', style='dashed', color='purple')
-        c.node('BlockNode')
-        c.node('IfStatementNode')
-        c.node('ForStatementNode') 
-        c.node('WhileStatementNode')
-        c.node('RepeatStatementNode')
-        c.node('EvaluateStatementNode')
-        c.node('TryStatementNode')
-        c.node('ReturnStatementNode')
-        c.node('ThrowStatementNode')
-        c.node('BreakStatementNode')        # Now connected!
-        c.node('ContinueStatementNode')     # Now connected!
-        c.node('ExpressionStatementNode')
-        c.node('LocalVariableDeclarationNode')
-    
-    with dot.subgraph(name='cluster_expressions') as c:
-        c.attr(label='Expressions', style='dashed', color='red', margin='20')
-        c.node('BinaryOperationNode')
-        c.node('MethodCallNode')
-        c.node('LiteralNode')
-        c.node('IdentifierNode')
-        c.node('ArrayAccessNode')
-        c.node('PropertyAccessNode')
+    # Edge legend with addition
+    ('edge_legend', 'Edge Types:', {'shape': 'plaintext'}),
+    ('contains_legend', 'Contains', {'shape': 'plaintext'}),
+    ('implements_legend', 'Implements', {'shape': 'plaintext'}),
+    ('references_legend', 'References', {'shape': 'plaintext'}),
+    ('control_legend', 'Can Use (break/continue)', {'shape': 'plaintext'}),  # NEW
+)
+
+# Legend edges reuse the chart's edge styles: (target node ID, edge style key)
+_LEGEND_EDGES = (
+    ('contains_legend', 'contains'),
+    ('implements_legend', 'implements'),
+    ('references_legend', 'references'),
+    ('control_legend', 'control_flow'),  # NEW
+)
+
+# The legend is static too; rendering it inside the chart saves a second dot run
+_LEGEND_STATEMENTS = (
+    *(f'{_quote(node_id)} [label={_quote(label)} {_format_attrs(attrs)}]\n'
+      for node_id, label, attrs in _LEGEND_NODES),
+    *(f'"edge_legend" -> {_quote(target)} [{_EDGE_ATTR_STRS[rel_type]}]\n'
+      for target, rel_type in _LEGEND_EDGES),
+)
+_LEGEND_BLOCK = ''.join([
+    '\tsubgraph cluster_legend {\n',
+    f'\t\tgraph [{_format_attrs({"label": "Legend", "style": "dashed", "color": "black"})}]\n',
+    *('\t\t' + stmt for stmt in _LEGEND_STATEMENTS),
+    '\t}\n',
+])
+# Without clusters the legend is drawn as loose nodes, with no box of its own
+_LEGEND_FLAT_BLOCK = ''.join('\t' + stmt for stmt in _LEGEND_STATEMENTS)
+
+def create_ast_hierarchy_chart(layout_engine: Optional[str] = None, spline_mode: str = 'ortho',
+                               use_clusters: bool = True) -> str:
+    """Create AST hierarchy chart v1.1 - V1 with targeted improvements.
     
-    with dot.subgraph(name='cluster_types') as c:
-        c.attr(label='Types', style='dashed', color='gray')
-        c.node('TypeNode')
-        c.node('BuiltInTypeNode')
-        c.node('ArrayTypeNode')
-        c.node('AppClassTypeNode')
+    Returns the DOT source, legend included; no graphviz wrapper object is built.
+    layout_engine selects the Graphviz engine via the graph's `layout`
+    attribute. It defaults to 'dot', or 'sfdp' for graphs larger than
+    LARGE_GRAPH_NODE_COUNT nodes.
+    spline_mode is the graph's `splines` setting, defaulting to V1's
+    orthogonal edges. 'ortho' routes every edge, which gets expensive on big
+    graphs; main() switches to 'line' (straight segments, no routing) above
+    STRAIGHT_EDGE_NODE_COUNT nodes.
+    The chart always draws the static _NODES/_RELATIONSHIPS tables, so the
+    sfdp, bounded-dot, 'line' and no-cluster paths are dormant at the current
+    36 nodes and only apply if those tables grow past the thresholds.
+    use_clusters draws the dashed category boxes and the legend's box. Each
+    cluster costs dot a nested layout pass, and a plain (non-cluster) subgraph
+    draws nothing, so when disabled the groups are left out entirely and the
+    legend nodes are emitted unboxed.
+    """
+    is_large = len(_NODES) > LARGE_GRAPH_NODE_COUNT
+    if layout_engine is None:
+        layout_engine = 'sfdp' if is_large else 'dot'
+    graph_attrs = dict(_GRAPH_ATTRS, layout=layout_engine, splines=spline_mode)
+    if layout_engine == 'dot' and is_large:
+        graph_attrs.update(_BOUNDED_DOT_ATTRS)
     
-    return dot
+    # Write straight into one buffer rather than building per-block strings
+    buf = io.StringIO()
+    buf.write('// PeopleCode Self-Hosted Parser AST Node Hierarchy v1.1\n')
+    buf.write('digraph ast_hierarchy_v1_1 {\n')
+    buf.write(f'\tgraph [{_format_attrs(graph_attrs)}]\n')
+    for n in _ESCAPED_NODES:
+        buf.write(f'\t{n.id} [label={n.label} {_NODE_ATTR_STRS[n.style_key]}]\n')
+    for e in _ESCAPED_RELATIONSHIPS:
+        buf.write(f'\t{e.src} -> {e.dst} [{_EDGE_ATTR_STRS[e.rel_type]}]\n')
+    if use_clusters:
+        buf.write(_CLUSTER_BLOCK)
+        buf.write(_LEGEND_BLOCK)
+    else:
+        buf.write(_LEGEND_FLAT_BLOCK)
+    buf.write('}\n')
+    return buf.getvalue()
 
-def create_legend_v1_1():
-    """Create legend for v1.1 (same as V1 with control_flow addition)."""
-    legend = graphviz.Digraph(name='legend_v1_1', format='svg')
-    legend.attr(rankdir='TB', bgcolor='white')
-    
-    # Same legend nodes as V1
-    legend.node('root_legend', 'Root Node\\n(ProgramNode)', 
-               shape='box', style='filled,bold', fillcolor='#4CAF50', fontcolor='white')
-    legend.node('program_legend', 'Program Components\\n(Import, Class, etc.)', 
-               shape='box', style='filled', fillcolor='#2196F3', fontcolor='white')
-    legend.node('declaration_legend', 'Declarations\\n(Method, Property, etc.)', 
-               shape='box', style='filled', fillcolor='#FF9800', fontcolor='white')
-    legend.node('statement_legend', 'Statements\\n(If, For, Block, etc.)', 
-               shape='ellipse', style='filled', fillcolor='#9C27B0', fontcolor='white')
-    legend.node('expression_legend', 'Expressions\\n(Binary, Method Call, etc.)', 
-               shape='diamond', style='filled', fillcolor='#E91E63', fontcolor='white')
-    legend.node('type_legend', 'Types\\n(BuiltIn, Array, etc.)', 
-               shape='hexagon', style='filled', fillcolor='#607D8B', fontcolor='white')
+# Output formats and the file name suffix each is written under (PNG keeps V1's `_png` name)
+FORMAT_SVG = 'svg'
+FORMAT_PNG = 'png'
+_OUTPUT_SUFFIXES = {FORMAT_SVG: '.svg', FORMAT_PNG: '_png.png'}
+
+def render_dot(source: str, out_base: str, outputs: List[Tuple[str, str]]) -> List[str]:
+    """Render DOT source to every (format, output path) pair in one `dot` run.
     
-    # Edge legend with addition
-    legend.node('edge_legend', 'Edge Types:', shape='plaintext')
-    legend.node('contains_legend', 'Contains', shape='plaintext')
-    legend.node('implements_legend', 'Implements', shape='plaintext')  
-    legend.node('references_legend', 'References', shape='plaintext')
-    legend.node('control_legend', 'Can Use (break/continue)', shape='plaintext')  # NEW
+    The source is piped to `dot` on stdin and laid out once; each -T/-o pair
+    just re-emits it.
+    A blake2b digest of the source and outputs is kept in `<out_base>.hash`;
+    if it matches and every output exists, `dot` is not run at all.
+    Returns the output paths in the order given.
+    """
+    hash_path = out_base + '.hash'
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(source.encode('utf-8'))
+    for fmt, out_path in outputs:
+        digest.update(f'\0{fmt}\0{out_path}'.encode('utf-8'))
+    source_hash = digest.hexdigest()
     
-    legend.edge('edge_legend', 'contains_legend', color='blue', style='solid', arrowhead='diamond')
-    legend.edge('edge_legend', 'implements_legend', color='green', style='dashed', arrowhead='empty')
-    legend.edge('edge_legend', 'references_legend', color='gray', style='dotted', arrowhead='vee')
-    legend.edge('edge_legend', 'control_legend', color='purple', style='solid', arrowhead='normal')  # NEW
+    out_paths = [out_path for _, out_path in outputs]
+    if os.path.exists(hash_path) and all(os.path.exists(p) for p in out_paths):
+        with open(hash_path, 'r', encoding='utf-8') as f:
+            if f.read().strip() == source_hash:
+                return out_paths
     
-    return legend
+    # Feed the source on stdin: no temporary .dot file to write and unlink
+    cmd = ['dot']
+    for fmt, out_path in outputs:
+        cmd += [f'-T{fmt}', '-o', out_path]
+    subprocess.run(cmd, input=source.encode('utf-8'), check=True)
+    with open(hash_path, 'w', encoding='utf-8') as f:
+        f.write(source_hash)
+    return out_paths
 
 def main():
     """Generate the AST hierarchy chart v1.1."""
-    print("Generating AST Node Hierarchy Chart v1.1...")
+    parser = argparse.ArgumentParser(description="Generate the AST hierarchy chart v1.1")
+    parser.add_argument('--png', action='store_true', help="Also render PNG versions (SVG only by default)")
+    args = parser.parse_args()
     
-    # Create the main hierarchy chart
-    chart = create_ast_hierarchy_chart()
-    
-    # Create the legend
-    legend = create_legend_v1_1()
+    print("Generating AST Node Hierarchy Chart v1.1...")
     
     # Define output directory
     output_dir = os.path.dirname(os.path.abspath(__file__))
+    formats = [FORMAT_SVG] + ([FORMAT_PNG] if args.png else [])
+    chart_base = os.path.join(output_dir, 'ast_hierarchy_chart_v1_1')
+    outputs = [(fmt, chart_base + _OUTPUT_SUFFIXES[fmt]) for fmt in formats]
+    
+    # Create the main hierarchy chart; skip orthogonal edge routing and
+    # nested cluster layout if _NODES grows past the thresholds (it is well below today)
+    spline_mode = 'line' if len(_NODES) > STRAIGHT_EDGE_NODE_COUNT else 'ortho'
+    use_clusters = len(_NODES) <= LARGE_GRAPH_NODE_COUNT
+    chart_src = create_ast_hierarchy_chart(spline_mode=spline_mode, use_clusters=use_clusters)
     
     try:
-        # Render the chart
-        chart_path = chart.render(os.path.join(output_dir, 'ast_hierarchy_chart_v1_1'), cleanup=True)
-        print(f"Chart v1.1 generated: {chart_path}")
-        
-        # Render the legend
-        legend_path = legend.render(os.path.join(output_dir, 'ast_hierarchy_legend_v1_1'), cleanup=True)
-        print(f"Legend v1.1 generated: {legend_path}")
-        
-        # Also generate PNG versions
-        chart.format = 'png'
-        chart_png_path = chart.render(os.path.join(output_dir, 'ast_hierarchy_chart_v1_1_png'), cleanup=True)
-        print(f"PNG Chart v1.1 generated: {chart_png_path}")
-        
-        legend.format = 'png'
-        legend_png_path = legend.render(os.path.join(output_dir, 'ast_hierarchy_legend_v1_1_png'), cleanup=True)
-        print(f"PNG Legend v1.1 generated: {legend_png_path}")
+        # Render the chart (legend included) in all formats from a single layout pass
+        for fmt, path in zip(formats, render_dot(chart_src, chart_base, outputs)):
+            prefix = '' if fmt == FORMAT_SVG else f"{fmt.upper()} "
+            print(f"{prefix}Chart v1.1 generated: {path}")
         
         print("\nV1.1 Targeted Improvements:")
         print("+ Connected BreakStatementNode and ContinueStatementNode to loop constructs")